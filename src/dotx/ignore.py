@@ -1,27 +1,248 @@
 """
 This module provides the tools to match lists of component names to ignore against actual file-system Paths.
 
-This is not an extremely robust or fancy implementation.  The names in the excludes list are glob patterns that will
-be matched against the entire path of the object in question, and also against each component of that path. Thus,
-you can ignore "*/deep/directory/*" or you can ignore "README.*", but don't try to ignore paths with slashes in them
-that _don't_ expect the entire prefix. It's simple, but that's all that's needed in this case.  You can ignore both
-directories and individual files if you call these functions appropriately.  The functions here were written with
-`os.walk` in mind.  There's room to grow, here, if ignore files turn out to be required, or if more robust globbing
-is needed.
+The names in the excludes list are glob patterns that will be matched against the entire path of the object in
+question, and also against each component of that path.  Thus, you can ignore "*/deep/directory/*" or you can ignore
+"README.*", but don't try to ignore paths with slashes in them that _don't_ expect the entire prefix.  You can ignore
+both directories and individual files if you call these functions appropriately.  The functions here were written with
+`os.walk` in mind, but `prune_ignored_directories` also accepts the `os.DirEntry`s of an `os.scandir` walk.
+
+A walk tests every path it visits, so each distinct list of excludes is compiled just once: excludes without glob
+magic become a dict lookup, and the globs become two regular expressions, one matching an entire path with `fnmatch`
+semantics, the other finding a matching component of a path in a single search.  There's room to grow, here, if ignore
+files turn out to be required.
 
 Exported functions:
     should_ignore_this_object
     prune_ignored_directories
 """
 
-from fnmatch import fnmatch
+from dataclasses import dataclass
+from fnmatch import translate
+import functools
 import logging
+import os
 from pathlib import Path
+import re
+from typing import TypeVar
 
 
 # TODO: figure out how to implement an ignore file
 
 
+_GLOB_MAGIC = re.compile(r"[*?[]")
+_SEPARATOR = re.escape(os.sep)
+# `prune_ignored_directories` hands back whichever kind of directory it was given
+_Directory = TypeVar("_Directory", str, os.DirEntry)
+# What `fnmatch.translate` currently wraps around every expression it returns
+_TRANSLATE_PREFIX = "(?s:"
+_TRANSLATE_SUFFIX = r")\Z"
+
+
+@dataclass(frozen=True, eq=False)
+class _CompiledExcludes:
+    """
+    A list of excludes, prepared once so that testing a path against all of them is cheap.
+
+    Attributes:
+        literals:           a dict mapping each exclude without glob magic (after `os.path.normcase`) back to the
+                            exclude as given; a plain dict lookup replaces pattern matching for these
+        globs:              the remaining excludes, in order
+        pattern:            the `globs` compiled into one alternation with a named group per glob, "e" followed by its
+                            index in `globs`, matching an entire string with `fnmatch` semantics; or `None` if there are
+                            no globs
+        component_pattern:  the `globs` that could match a single path component, compiled (with the same group names)
+                            to be `search`ed for, anchored at separators, within an entire path; or `None`
+
+    Instances compare and hash by identity; `_compile_excludes` hands out one per distinct list of excludes, which is
+    what lets `_find_exclude` use them as part of its cache key.
+    """
+
+    literals: dict[str, str]
+    globs: tuple[str, ...]
+    pattern: re.Pattern | None
+    component_pattern: re.Pattern | None
+
+    @functools.cached_property
+    def anchor_exclude(self) -> str | None:
+        """The exclude matching the root of an absolute path, which `Path.parts` treats as a component of its own."""
+        return self.match(os.sep)
+
+    def match(self, candidate: str) -> str | None:
+        """Return the exclude matching the entire, already normalized, string `candidate`, or `None`."""
+        exclude = self.literals.get(candidate)
+        if exclude is None and self.pattern is not None:
+            match = self.pattern.match(candidate)
+            if match is not None:
+                exclude = self._matched_glob(match)
+        return exclude
+
+    def _matched_glob(self, match: re.Match) -> str:
+        """Return the glob whose named group, "e" followed by its index in `globs`, is the one that made `match`."""
+        group = match.lastgroup
+        assert group is not None, "every alternative is a named group"
+        return self.globs[int(group[1:])]
+
+    def match_component(self, path_str: str) -> str | None:
+        """Return the exclude matching any one component of the already normalized `path_str`, or `None`."""
+        if self.anchor_exclude is not None and path_str.startswith(os.sep):
+            return self.anchor_exclude
+        if self.literals:
+            components = path_str.split(os.sep)
+            if not self.literals.keys().isdisjoint(components):
+                return next(self.literals[c] for c in components if c in self.literals)
+        if self.component_pattern is not None:
+            match = self.component_pattern.search(path_str)
+            if match is not None:
+                return self._matched_glob(match)
+        return None
+
+
+def _bracket_expression_end(glob: str, i: int) -> int:
+    """
+    Return the index of the "]" closing the bracket expression whose "[" is just before index `i` of `glob`.
+
+    The end is found the same way `fnmatch.translate` finds it.  If there is no closing "]", returns `len(glob)`, and
+    the "[" is just an ordinary character.
+    """
+    n = len(glob)
+    if i < n and glob[i] == "!":
+        i += 1
+    if i < n and glob[i] == "]":
+        i += 1
+    while i < n and glob[i] != "]":
+        i += 1
+    return i
+
+
+def _has_separator_outside_brackets(glob: str) -> bool:
+    """
+    Return `True` if `glob` has a path separator outside any bracket expression, so it can only match across components.
+
+    A separator inside a bracket expression, as in "[!/]", doesn't count: `_translate_component` keeps such an
+    expression from ever matching a separator, so the glob can still match a single component.
+    """
+    i, n = 0, len(glob)
+    while i < n:
+        c = glob[i]
+        i += 1
+        if c == os.sep:
+            return True
+        if c == "[":
+            j = _bracket_expression_end(glob, i)
+            if j < n:
+                i = j + 1
+    return False
+
+
+def _translate_bracket_expression(bracket_expression: str) -> str:
+    """
+    Translate the complete `bracket_expression`, e.g., "[!a-c]", into the regular expression `fnmatch` would use for it.
+
+    `fnmatch.translate` only translates whole globs, anchoring the result and wrapping it in flags; this unwraps that.
+    The wrapper is an implementation detail of `fnmatch`, so it's checked rather than assumed.  Should it ever change,
+    the bracket expression is translated here instead, the same way except for the rarely used corner cases of empty
+    or reversed ranges.
+    """
+    translated = translate(bracket_expression)
+    if translated.startswith(_TRANSLATE_PREFIX) and translated.endswith(
+        _TRANSLATE_SUFFIX
+    ):
+        return translated[len(_TRANSLATE_PREFIX) : -len(_TRANSLATE_SUFFIX)]
+
+    characters = bracket_expression[1:-1].replace("\\", "\\\\")
+    characters = re.sub(r"([&~|])", r"\\\1", characters)
+    if characters[:1] == "!":
+        characters = "^" + characters[1:]
+    elif characters[:1] in ("^", "["):
+        characters = "\\" + characters
+    return f"[{characters}]"
+
+
+def _translate_component(glob: str) -> str:
+    """
+    Translate `glob` like `fnmatch.translate`, but unanchored, and such that no wildcard can match a path separator.
+
+    Bracket expressions are handed to `fnmatch.translate` itself, so ranges and negation behave exactly as in `fnmatch`.
+    """
+    not_separator = f"[^{_SEPARATOR}]"
+    result = []
+    i, n = 0, len(glob)
+    while i < n:
+        c = glob[i]
+        i += 1
+        if c == "*":
+            result.append(f"{not_separator}*")
+        elif c == "?":
+            result.append(not_separator)
+        elif c == "[":
+            j = _bracket_expression_end(glob, i)
+            if j >= n:
+                result.append(re.escape(c))
+            else:
+                bracket_expression = _translate_bracket_expression(glob[i - 1 : j + 1])
+                result.append(f"(?!{_SEPARATOR}){bracket_expression}")
+                i = j + 1
+        else:
+            result.append(re.escape(c))
+    return "".join(result)
+
+
+@functools.cache
+def _compile_excludes(excludes: tuple[str, ...]) -> _CompiledExcludes:
+    """
+    Partition `excludes` into literal names and glob patterns, compiling all the globs into regular expressions.
+
+    Globs get two expressions: one for matching an entire path string, where, as in `fnmatch`, "*" can cross a
+    separator; and one `search`ed for just once per path to find a match of any single component, which replaces
+    looping over the components.  This is cached for the life of the process, so each distinct set of excludes is only
+    translated and compiled once.  Callers pass `tuple(sorted(excludes))`, so the same excludes given in a different
+    order share one entry.
+    """
+    literals: dict[str, str] = {}
+    globs: list[str] = []
+    for exclude in excludes:
+        if _GLOB_MAGIC.search(exclude):
+            globs.append(exclude)
+        elif exclude:
+            literals.setdefault(os.path.normcase(exclude), exclude)
+    pattern = None
+    component_pattern = None
+    if globs:
+        normalized_globs = [os.path.normcase(glob) for glob in globs]
+        pattern = re.compile(
+            "|".join(
+                f"(?P<e{index}>{translate(glob)})"
+                for index, glob in enumerate(normalized_globs)
+            )
+        )
+        component_alternatives = [
+            f"(?P<e{index}>{_translate_component(glob)})"
+            for index, glob in enumerate(normalized_globs)
+            if not _has_separator_outside_brackets(glob)
+        ]
+        if component_alternatives:
+            component_pattern = re.compile(
+                rf"(?:^|{_SEPARATOR})(?:{'|'.join(component_alternatives)})(?={_SEPARATOR}|\Z)",
+                re.DOTALL,
+            )
+    return _CompiledExcludes(literals, tuple(globs), pattern, component_pattern)
+
+
+@functools.lru_cache(maxsize=4096)
+def _find_exclude(path_str: str, compiled: _CompiledExcludes) -> str | None:
+    """
+    Return the exclude matching the normalized `path_str`, or any of its components, or `None` if nothing matches.
+
+    A walk asks about the same paths more than once, e.g., a directory is tested when its parent prunes it and again
+    when the walk arrives in it, so answers are remembered in a bounded cache.
+    """
+    exclude = compiled.match(path_str)
+    if exclude is None:
+        exclude = compiled.match_component(path_str)
+    return exclude
+
+
 def should_ignore_this_object(
     file_system_object: Path, excludes: list[str] | None = None
 ) -> bool:
@@ -36,36 +257,59 @@ def should_ignore_this_object(
     Returns a bool: True means "yes, ignore this object".
     """
     if excludes:
-        path_str = str(file_system_object)
-        path_parts = file_system_object.parts
-        for exclude in excludes:
-            if fnmatch(path_str, exclude):
-                logging.info(f"Ignoring {file_system_object} because of {exclude}")
-                return True
-            for part in path_parts:
-                if fnmatch(part, exclude):
-                    logging.info(f"Ignoring {file_system_object} because of {exclude}")
-                    return True
+        exclude = _find_exclude(
+            os.path.normcase(str(file_system_object)),
+            _compile_excludes(tuple(sorted(excludes))),
+        )
+        if exclude is not None:
+            logging.info(f"Ignoring {file_system_object} because of {exclude}")
+            return True
     return False
 
 
 def prune_ignored_directories(
-    root: Path, directories: list[str], excludes: list[str] | None
-) -> list[str]:
+    root: Path,
+    directories: list[_Directory],
+    excludes: list[str] | None,
+) -> list[_Directory]:
     """
     Returns a list dirnames that are _not_ ignored to replace an existing list in a top-down `os.walk`.
 
     Takes three arguments:
         root:           a pathlib.Path, the directory that holds the dirs listed in `directories`
-        directories:    a list of strings, the dirnames product of `os.walk`
+        directories:    a list of strings, the dirnames product of `os.walk`; or a list of `os.DirEntry`s for those
+                        directories from `os.scandir(root)`, in which case the test uses each `entry.name` and never
+                        builds a `Path`
         excludes:       a list of strings, simple names to be excluded if they appear anywhere in an objects path
 
-    Returns: a list of strings, the allowed dirnames.  This result can be substituted in-place for the dirnames list
-    in a top-down `os.walk`, e.g., dirnames[:] = prune_ignored_directories(Path(dirpath), dirnames, excludes).  That
-    would stop `os.walk` from descending into excluded directories.
+    Returns: a list of the allowed dirnames (or `os.DirEntry`s, matching what was passed in).  This result can be
+    substituted in-place for the dirnames list in a top-down `os.walk`, e.g.,
+    dirnames[:] = prune_ignored_directories(Path(dirpath), dirnames, excludes).  That would stop `os.walk` from
+    descending into excluded directories.
     """
-    return [
-        dirname
-        for dirname in directories
-        if not should_ignore_this_object(root / dirname, excludes)
-    ]
+    if not excludes:
+        return list(directories)
+    compiled = _compile_excludes(tuple(sorted(excludes)))
+
+    # Every candidate shares the components of `root`, so test those once for the whole batch
+    root_str = os.path.normcase(str(root))
+    if root_str != ".":
+        exclude = compiled.match_component(root_str)
+        if exclude is not None:
+            logging.info(f"Ignoring {root} because of {exclude}")
+            return []
+
+    # What's left per directory: its own name as a component, and its complete path
+    root_prefix = "" if root_str == "." else os.path.join(root_str, "")
+    allowed_directories: list[_Directory] = []
+    for directory in directories:
+        dirname = directory if isinstance(directory, str) else directory.name
+        normalized_dirname = os.path.normcase(dirname)
+        exclude = compiled.match(normalized_dirname) or compiled.match(
+            root_prefix + normalized_dirname
+        )
+        if exclude is None:
+            allowed_directories.append(directory)
+        else:
+            logging.info(f"Ignoring {root / dirname} because of {exclude}")
+    return allowed_directories
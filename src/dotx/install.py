@@ -5,6 +5,7 @@ Builds a `dotx.plan.Plan` designed to install (mostly by linking) the files pres
 into the destination root.  That plan can then be executed by `dotx.plan.execute_plan`.
 
 Exported functions:
+    iter_plan_install_paths
     plan_install
     plan_install_paths
 """
@@ -12,8 +13,12 @@ Exported functions:
 
 # TODO: update docstrings for functions to list parameters and return values
 
+import errno
+import functools
 import logging
 import os
+import sys
+from collections.abc import Iterator
 from pathlib import Path
 
 from dotx.ignore import prune_ignored_directories, should_ignore_this_object
@@ -21,21 +26,31 @@ from dotx.plan import (
     Action,
     Plan,
     PlanNode,
+    ROOT_KEY,
+    index_directories,
     log_extracted_plan,
     mark_all_ancestors,
-    mark_immediate_children,
+    mark_children,
 )
 
 
+_DOT_PREFIX = "dot-"
+_DOT_PREFIX_LENGTH = len(_DOT_PREFIX)
+# Where a name missing from a directory listing may still be there, spelled with different case
+_CASE_INSENSITIVE_PLATFORM = sys.platform in ("darwin", "win32")
+
+
 def plan_install(
     source_package_root: Path, destination_root: Path, excludes: list[str] | None = None
 ) -> Plan:
     """
     Create a plan to install the contents of `source_package_root` into `destination_root` ignoring `excludes`.
 
-    The algorithm is to traverse, with a bottom-up call to `os.walk`, the source package, determining which paths
-    already exists at the destination, which must be created, renamed, linked, or already exist in a way that causes
-    a failure.
+    The algorithm is to visit the directories of the source package bottom-up, as found by `plan_install_paths`
+    (without walking the source a second time), determining which paths already exists at the destination, which must
+    be created, renamed, linked, or already exist in a way that causes a failure.  Something "exists" at the destination
+    if there is any entry at all with that name, even a dangling symlink.  Anything there other than a directory (or a
+    symlink to one) can't be installed over, so that object fails.
 
     Takes three arguments:
         source_package_root:    a pathlib.Path to the directory containing the files (hierarchy) to be installed
@@ -45,35 +60,39 @@ def plan_install(
     Returns: a `Plan` with all the information needed to complete an install, or to fail
     """
     plan: Plan = plan_install_paths(source_package_root, excludes)
+    destination_root_str = os.fspath(destination_root)
+    destination_entries: dict[Path, dict[str, os.DirEntry] | None] = {}
 
-    # TODO: add comments, this loop looks impenetrable
-    for current_root, child_directories, child_files in os.walk(
-        source_package_root, topdown=False
-    ):
-        current_root_path = Path(current_root)
-        relative_root_path = current_root_path.relative_to(source_package_root)
-        if relative_root_path not in plan:
-            continue
+    # The plan already holds everything the walk found, so index it by directory rather than walking the source again.
+    # Visiting the directories deepest first means that, as with a bottom-up `os.walk`, every directory is decided
+    # after everything inside it.
+    directories = index_directories(plan)
 
+    for relative_root_path in sorted(
+        directories, key=lambda path: len(path.parts), reverse=True
+    ):
         relative_destination_root_path = plan[
             relative_root_path
         ].relative_destination_path
+        child_relative_source_paths = directories[relative_root_path]
 
+        # A child that would land on top of something other than a directory fails
         found_children_to_rename = False
-        for child in child_directories + child_files:
-            child_relative_source_path = relative_root_path / child
-            if child_relative_source_path not in plan:
-                continue
+        for child_relative_source_path in child_relative_source_paths:
             if plan[child_relative_source_path].requires_rename:
                 found_children_to_rename = True
-            destination_path = (
-                destination_root
-                / plan[child_relative_source_path].relative_destination_path
+            is_present, is_directory = _look_up_destination(
+                destination_root_str,
+                plan[child_relative_source_path].relative_destination_path,
+                destination_entries,
             )
-            if destination_path.exists() and destination_path.is_file():
+            if is_present and not is_directory:
                 plan[child_relative_source_path].action = Action.FAIL
 
-        if current_root_path == source_package_root:
+        # A directory is created if it holds renamed children (a link would keep their source names), is left alone
+        # if it already exists, and otherwise is linked whole.  Ancestors of a created or existing directory can't be
+        # links.
+        if relative_root_path == ROOT_KEY:
             plan[relative_root_path].action = Action.EXISTS
         elif found_children_to_rename:
             plan[relative_root_path].action = Action.CREATE
@@ -83,7 +102,9 @@ def plan_install(
                 stop_mark=Action.EXISTS,
                 plan=plan,
             )
-        elif (destination_root / relative_destination_root_path).exists():
+        elif _look_up_destination(
+            destination_root_str, relative_destination_root_path, destination_entries
+        )[0]:
             plan[relative_root_path].action = Action.EXISTS
             mark_all_ancestors(
                 relative_root_path,
@@ -94,95 +115,127 @@ def plan_install(
         else:
             plan[relative_root_path].action = Action.LINK
 
+        # Children of a real directory are linked individually; children of a linked directory come along for free
         if plan[relative_root_path].action in {Action.CREATE, Action.EXISTS}:
-            mark_immediate_children(
-                relative_root_path,
+            mark_children(
+                child_relative_source_paths,
                 mark=Action.LINK,
                 allow_overwrite={Action.NONE},
-                source_package_root=source_package_root,
                 plan=plan,
             )
-        elif plan[relative_root_path].action == Action.LINK:
-            mark_immediate_children(
-                relative_root_path,
+        elif plan[relative_root_path].action is Action.LINK:
+            mark_children(
+                child_relative_source_paths,
                 mark=Action.SKIP,
                 allow_overwrite={Action.NONE, Action.LINK},
-                source_package_root=source_package_root,
                 plan=plan,
             )
 
-    del plan[Path(".")]
+    del plan[ROOT_KEY]
     return plan
 
 
+def _is_directory(entry: os.DirEntry) -> bool:
+    """Return `entry.is_dir()`, but `False` for an entry that can't be followed, e.g., a symlink loop."""
+    try:
+        return entry.is_dir()
+    except OSError:
+        return False
+
+
+def _look_up_destination(
+    destination_root: str,
+    relative_destination_path: Path,
+    destination_entries: dict[Path, dict[str, os.DirEntry] | None],
+) -> tuple[bool, bool]:
+    """
+    Return `(is_present, is_directory)` for a destination path, preferably from the listing of its parent directory.
+
+    Something is present if there is any entry at all with that name, even a dangling symlink; it is a directory if it
+    is one, or is a symlink to one.  If the parent can't be listed, though it may still be searched, the path is checked
+    with its own `os.lstat` and `stat` instead.  So is a name missing from a listing on a platform whose file-systems
+    usually ignore case, where the same object may be listed under a name spelled differently.
+
+    Takes three arguments:
+        destination_root:           a string, the actual destination root
+        relative_destination_path:  the pathlib.Path, relative to `destination_root`, of the object to look up
+        destination_entries:        a dict of the listings already made, as in `_scan_destination`
+
+    Returns: a tuple of two bools
+    """
+    children = _scan_destination(
+        destination_root, relative_destination_path.parent, destination_entries
+    )
+    if children is not None:
+        entry = children.get(relative_destination_path.name)
+        if entry is not None:
+            return True, _is_directory(entry)
+        if not _CASE_INSENSITIVE_PLATFORM:
+            return False, False
+    path = os.path.join(destination_root, relative_destination_path)
+    return os.path.lexists(path), os.path.isdir(path)
+
+
+def _scan_destination(
+    destination_root: str,
+    relative_destination_path: Path,
+    destination_entries: dict[Path, dict[str, os.DirEntry] | None],
+) -> dict[str, os.DirEntry] | None:
+    """
+    Return the children of a destination directory, by name, listing the directory with `os.scandir` only once.
+
+    Every child of a source directory is checked against the same destination directory, and each directory is looked
+    up again in its parent's listing, so one scan per destination directory replaces a `stat` per path.  A destination
+    directory that doesn't exist, isn't a directory, or is a symlink loop has no children.  Any other failure, e.g., a
+    directory that can be searched but not read, means there is no listing, and the result is `None`.
+
+    Takes three arguments:
+        destination_root:           a string, the actual destination root
+        relative_destination_path:  the pathlib.Path, relative to `destination_root`, of the directory to list
+        destination_entries:        a dict of the listings already made, or `None` where there couldn't be one, keyed
+                                    by `relative_destination_path`
+
+    Returns: a dict mapping each child's name to its `os.DirEntry`, or `None`
+    """
+    if relative_destination_path in destination_entries:
+        return destination_entries[relative_destination_path]
+    children: dict[str, os.DirEntry] | None
+    try:
+        directory = os.path.join(destination_root, relative_destination_path)
+        with os.scandir(directory) as entries:
+            children = {entry.name: entry for entry in entries}
+    except (FileNotFoundError, NotADirectoryError):
+        children = {}
+    except OSError as error:
+        children = {} if error.errno == errno.ELOOP else None
+    destination_entries[relative_destination_path] = children
+    return children
+
+
 def plan_install_paths(
     source_package_root: Path, excludes: list[str] | None = None
 ) -> Plan:
     """
     Construct an initial `Plan` that contains only the affected paths.
 
-    The algorithm is to traverse, with a top-down call to `os.walk`, the file-system objects within
-    `source_package_root`, deciding along the way which ones are directories, and independent of that, which ones
-    need to be renamed to be installed correctly.  The `plan.Action` for all of these nodes is `Action.NONE` so they
-    can easily be overwritten later by code that figures out exactly what needs to be done.  No nodes are created for
-    file-system objects that are "ignored" (as described by `excludes`).  Files or directories whose source name
-    begins with "dot-", e.g., "dot-bashrc", are marked as needing to be renamed on the way to installation and the
-    destination name is calculated here, substituting an actual "." for the "dot-" prefix.  Because the paths are
-    visited top-down, renamed parents already have their correct destination path recorded, so the complete path is
-    always known.  Because the destination paths are all relative to the destination root, the actual destination
-    root is not needed.
+    The algorithm is to traverse, top-down with `os.scandir`, the file-system objects within `source_package_root`,
+    deciding along the way which ones are directories, and independent of that, which ones need to be renamed to be
+    installed correctly.  The `plan.Action` for all of these nodes is `Action.NONE` so they can easily be overwritten
+    later by code that figures out exactly what needs to be done.  No nodes are created for file-system objects that
+    are "ignored" (as described by `excludes`).  Files or directories whose source name begins with "dot-", e.g.,
+    "dot-bashrc", are marked as needing to be renamed on the way to installation and the destination name is
+    calculated here, substituting an actual "." for the "dot-" prefix.  Because the paths are visited top-down,
+    renamed parents already have their correct destination path recorded, so the complete path is always known.
+    Because the destination paths are all relative to the destination root, the actual destination root is not needed.
 
     Takes two arguments:
         source_package_root:    the actual directory _containing_ the files or directories to install
         excludes:               a list of strings that are path components indicating a file-system object should be
                                 ignored
 
-    Returns: a `Plan` with correct paths, `is_dir`, and `requires_rename` in every node.
+    Returns: a `Plan` with correct paths, `is_dir`, `is_symlink`, and `requires_rename` in every node.
     """
-    logging.info(
-        f"Planning install paths for source package {source_package_root} excluding {excludes}"
-    )
-    plan: Plan = {
-        Path("."): PlanNode(
-            action=Action.EXISTS,
-            requires_rename=False,
-            relative_source_path=Path("."),
-            relative_destination_path=Path("."),
-            is_dir=True,
-        )
-    }
-
-    # TODO: more comments; another impenetrable loop
-    for current_root, child_directories, child_files in os.walk(source_package_root):
-        current_root_path = Path(current_root)
-        child_directories[:] = prune_ignored_directories(
-            current_root_path, child_directories, excludes
-        )
-        if should_ignore_this_object(current_root_path, excludes):
-            continue
-
-        relative_root_path = current_root_path.relative_to(source_package_root)
-        current_destination_path = plan[relative_root_path].relative_destination_path
-
-        for child in child_directories + child_files:
-            requires_rename = False
-            child_relative_source_path = relative_root_path / child
-            if should_ignore_this_object(child_relative_source_path, excludes):
-                continue
-            if child.startswith("dot-"):
-                requires_rename = True
-                child_relative_destination_path = current_destination_path / (
-                    "." + child[4:]
-                )
-            else:
-                child_relative_destination_path = current_destination_path / child
-            plan[child_relative_source_path] = PlanNode(
-                action=Action.NONE,
-                requires_rename=requires_rename,
-                relative_source_path=child_relative_source_path,
-                relative_destination_path=child_relative_destination_path,
-                is_dir=(source_package_root / child_relative_source_path).is_dir(),
-            )
+    plan: Plan = dict(iter_plan_install_paths(source_package_root, excludes))
 
     log_extracted_plan(
         plan,
@@ -193,3 +246,118 @@ def plan_install_paths(
         actions_to_extract={Action.NONE},
     )
     return plan
+
+
+def iter_plan_install_paths(
+    source_package_root: Path, excludes: list[str] | None = None
+) -> Iterator[tuple[Path, PlanNode]]:
+    """
+    Generate, one at a time, the `(relative_source_path, PlanNode)` pairs that `plan_install_paths` collects.
+
+    The first pair is always the root of the package, `ROOT_KEY`, marked `Action.EXISTS`; then, top-down, one pair
+    per file-system object that isn't ignored, exactly as described for `plan_install_paths`.  Nothing is kept between
+    pairs beyond the directories still waiting to be scanned, so a caller that only needs to look at each node once
+    doesn't have to hold the whole `Plan` in memory.
+
+    Takes two arguments:
+        source_package_root:    the actual directory _containing_ the files or directories to install
+        excludes:               a list of strings that are path components indicating a file-system object should be
+                                ignored
+
+    Returns: an iterator of `(pathlib.Path, PlanNode)` tuples, keys and values suitable for a `Plan`
+    """
+    logging.info(
+        f"Planning install paths for source package {source_package_root} excluding {excludes}"
+    )
+    yield ROOT_KEY, PlanNode(
+        action=Action.EXISTS,
+        requires_rename=False,
+        relative_source_path=ROOT_KEY,
+        relative_destination_path=Path("."),
+        is_dir=True,
+    )
+
+    if not should_ignore_this_object(source_package_root, excludes):
+        yield from _iter_directory_paths(
+            os.fspath(source_package_root), ROOT_KEY, Path("."), excludes
+        )
+
+
+@functools.lru_cache(maxsize=4096)
+def _destination_name(name: str) -> str:
+    """
+    Return the name under which a source file-system object called `name` is installed.
+
+    A leading "dot-" becomes an actual ".", e.g., "dot-bashrc" is installed as ".bashrc"; any other name is unchanged.
+    The same few names recur throughout a package (and across packages), so the answers are cached.
+    """
+    if name[:_DOT_PREFIX_LENGTH] == _DOT_PREFIX:
+        return "." + name[_DOT_PREFIX_LENGTH:]
+    return name
+
+
+def _iter_directory_paths(
+    directory: str,
+    relative_root_path: Path,
+    relative_destination_root_path: Path,
+    excludes: list[str] | None,
+) -> Iterator[tuple[Path, PlanNode]]:
+    """
+    Generate a `(relative_source_path, PlanNode)` pair for each child of `directory` that isn't ignored, then do the
+    same inside each child directory.
+
+    Everything needed about a child comes from the `os.DirEntry` that `os.scandir` returns for it.  On most platforms
+    that means asking whether it is a directory costs no extra `stat`.  As with `os.walk`, a directory that can't be
+    read contributes no children, and a symlink to a directory is planned but not descended into.
+
+    Takes four arguments:
+        directory:                      a string, the actual directory to scan
+        relative_root_path:             the `pathlib.Path` of `directory` relative to the source package root
+        relative_destination_root_path: where `directory` will be installed, relative to the destination root
+        excludes:                       a list of strings, as in `plan_install_paths`
+
+    Returns: an iterator of `(pathlib.Path, PlanNode)` tuples
+    """
+    try:
+        with os.scandir(directory) as entries:
+            child_entries = list(entries)
+    except OSError:
+        return
+
+    child_directories: list[os.DirEntry] = prune_ignored_directories(
+        Path(directory), [entry for entry in child_entries if entry.is_dir()], excludes
+    )
+    child_files = [entry for entry in child_entries if not entry.is_dir()]
+
+    planned_directories: list[tuple[str, Path, Path]] = []
+    for entry in child_directories + child_files:
+        child = entry.name
+        child_relative_source_path = relative_root_path / child
+        if should_ignore_this_object(child_relative_source_path, excludes):
+            continue
+        destination_name = _destination_name(child)
+        requires_rename = destination_name != child
+        child_relative_destination_path = (
+            relative_destination_root_path / destination_name
+        )
+        is_dir = entry.is_dir()
+        is_symlink = entry.is_symlink()
+        yield child_relative_source_path, PlanNode(
+            action=Action.NONE,
+            requires_rename=requires_rename,
+            relative_source_path=child_relative_source_path,
+            relative_destination_path=child_relative_destination_path,
+            is_dir=is_dir,
+            is_symlink=is_symlink,
+        )
+        if is_dir and not is_symlink:
+            planned_directories.append(
+                (
+                    entry.path,
+                    child_relative_source_path,
+                    child_relative_destination_path,
+                )
+            )
+
+    for child_directory in planned_directories:
+        yield from _iter_directory_paths(*child_directory, excludes)
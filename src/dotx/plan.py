@@ -14,14 +14,17 @@ Exported types:
     PlanNode:   a class that gives the complete details for handling a specific file-system object
     Plan:       a type alias for a dict of PlanNodes keyed by pathlib.Paths relative to the source package root
 
+Exported constants:
+    ROOT_KEY:   the key of the source package root itself in a `Plan`, `Path(".")`
+
 Exported functions:
     execute_plan
     extract_plan
+    index_directories
     log_extracted_failures
     log_extracted_plan
     mark_all_ancestors
-    mark_all_descendents
-    mark_immediate_children
+    mark_children
 """
 
 import logging
@@ -55,7 +58,7 @@ class Action(Enum):
     EXISTS = "exists"
 
 
-@dataclass
+@dataclass(slots=True)
 class PlanNode:
     """
     Provides all the information needed to install or uninstall a single file-system object
@@ -71,6 +74,8 @@ class PlanNode:
         relative_destination_path:  the `pathlib.Path` of the installed file-system object relative to the destination
                                     location root
         is_dir:                     `True` when this file-system object is a directory
+        is_symlink:                 `True` when the source file-system object is itself a symlink; a symlink to a
+                                    directory is planned, but its contents are not
     """
 
     action: Action
@@ -78,9 +83,11 @@ class PlanNode:
     relative_source_path: Path
     relative_destination_path: Path
     is_dir: bool
+    is_symlink: bool = False
 
 
 Plan = dict[Path, PlanNode]
+ROOT_KEY = Path(".")
 
 
 def execute_plan(source_package_root: Path, destination_root: Path, plan: Plan):
@@ -172,6 +179,31 @@ def extract_plan(plan: Plan, actions: set[Action]) -> list[PlanNode]:
     ]
 
 
+def index_directories(plan: Plan) -> dict[Path, list[Path]]:
+    """
+    Index a `Plan` by directory, mapping each directory to the keys of its children, so a second walk isn't needed.
+
+    Only the directories a walk of the source package actually descends into are included: the root, `ROOT_KEY`, and
+    every directory node that isn't a symlink to a directory.  Those are exactly the directories whose children can be
+    in the plan.  Children are listed in the order they appear in `plan`.  Everything needed is already in the nodes,
+    so this makes no file-system calls.
+
+    Takes one argument:
+        plan:   the `Plan` to index, e.g., fresh from `dotx.install.plan_install_paths`
+
+    Returns: a dict mapping the `pathlib.Path` of each directory to a list of the `pathlib.Path`s of its children
+    """
+    directories: dict[Path, list[Path]] = {
+        relative_source_path: []
+        for relative_source_path, node in plan.items()
+        if node.is_dir and not node.is_symlink
+    }
+    for relative_source_path in plan:
+        if relative_source_path != ROOT_KEY:
+            directories[relative_source_path.parent].append(relative_source_path)
+    return directories
+
+
 def log_extracted_failures(
     plan: Plan, *, description: str | None = None, log_level=logging.INFO, key=None
 ):
@@ -237,65 +269,25 @@ def mark_all_ancestors(child: Path, mark: Action, stop_mark: Action, plan: Plan)
             plan[parent].action = mark
 
 
-def mark_all_descendents(
-    parent: Path,
-    mark: Action,
-    allow_overwrite: set[Action],
-    source_package_root: Path,
-    plan: Plan,
-):
-    """
-    Mark every descendent of `parent` with the given `Action`, both files and directories.
-
-    `allow_overwrite` is key, here.  For instance, `PlanNode`s start with an `action` of `Action.NONE`. If you were
-    marking the children with `Action.LINK`, you'd want to be allowed to overwrite those whose `action` was still
-    `Action.NONE`.
-
-    Takes four arguments:
-        source_package_root:    a `pathlib.Path` needed to build paths to key into the `Plan`
-        parent:                 the `pathlib.Path` to a directory whose descendents you wish to mark
-        mark:                   the `Action` with which to mark the children
-        allow_overwrite:        ...but only if they are currently marked with an `Action` from this set
-    """
-    this_directory = source_package_root / parent
-    for child in this_directory.iterdir():
-        child_relative_path = child.relative_to(source_package_root)
-        if (
-            child_relative_path in plan
-            and plan[child_relative_path].action in allow_overwrite
-        ):
-            plan[child_relative_path].action = mark
-        if child.is_dir():
-            mark_all_descendents(
-                child_relative_path, mark, allow_overwrite, source_package_root, plan
-            )
-
-
-def mark_immediate_children(
-    parent: Path,
+def mark_children(
+    child_relative_source_paths: list[Path],
     mark: Action,
     allow_overwrite: set[Action],
-    source_package_root: Path,
     plan: Plan,
 ):
     """
-    Mark each child of `parent` with the given `Action`, both files and directories.
+    Mark each of the given children of a directory with `mark`, both files and directories.
 
     `allow_overwrite` is key, here.  For instance, `PlanNode`s start with an `action` of `Action.NONE`. If you were
     marking the children with `Action.LINK`, you'd want to be allowed to overwrite those whose `action` was still
-    `Action.NONE`.
+    `Action.NONE`.  The children usually come from `index_directories`, so marking them costs no file-system calls.
 
     Takes four arguments:
-        source_package_root:    a `pathlib.Path` needed to build paths to key into the `Plan`
-        parent:                 the `pathlib.Path` to a directory whose children you wish to mark
-        mark:                   the `Action` with which to mark the children
-        allow_overwrite:        ...but only if they are currently marked with an `Action` from this set
+        child_relative_source_paths:    the keys in `plan` of a directory's children
+        mark:                           the `Action` with which to mark the children
+        allow_overwrite:                ...but only if they are currently marked with an `Action` from this set
+        plan:                           the `Plan` in which this all takes place
     """
-    this_directory = source_package_root / parent
-    for child in this_directory.iterdir():
-        child_relative_path = child.relative_to(source_package_root)
-        if (
-            child_relative_path in plan
-            and plan[child_relative_path].action in allow_overwrite
-        ):
-            plan[child_relative_path].action = mark
+    for child_relative_source_path in child_relative_source_paths:
+        if plan[child_relative_source_path].action in allow_overwrite:
+            plan[child_relative_source_path].action = mark
@@ -10,57 +10,105 @@ Exported functions:
 
 import os
 from pathlib import Path
+import stat
 
-from dotx.plan import Action, Plan, mark_all_descendents
+from dotx.plan import Action, Plan, ROOT_KEY, index_directories, mark_children
 from dotx.install import plan_install_paths
 
 
 def plan_uninstall(
     source_package_root: Path, destination_root: Path, excludes: list[str] | None = None
 ) -> Plan:
+    """
+    Create a plan to uninstall the contents of `source_package_root` from `destination_root` ignoring `excludes`.
+
+    The algorithm is to visit the directories of the source package top-down, as found by `plan_install_paths`
+    (without walking the source a second time).  Files whose destination is a symlink are unlinked.  A directory
+    whose destination doesn't exist is skipped, and one whose destination is a symlink is unlinked; either way,
+    everything inside it is skipped.
+
+    Takes three arguments:
+        source_package_root:    a pathlib.Path to the directory containing the files (hierarchy) that were installed
+        destination_root:       a pathlib.Path where the source files were installed, e.g., $HOME
+        excludes:               a list of strings, path components that will cause a source file to be ignored
+
+    Returns: a `Plan` with all the information needed to complete an uninstall
+    """
     plan: Plan = plan_install_paths(source_package_root, excludes)
+    directories = index_directories(plan)
+    destination_root_str = os.fspath(destination_root)
 
-    for current_root, _, child_files in os.walk(source_package_root):
-        current_root_path = Path(current_root)
-        relative_root_path = current_root_path.relative_to(source_package_root)
-        if (
-            relative_root_path not in plan
-            or plan[relative_root_path].action == Action.SKIP
-        ):
+    # Shallowest first, so a directory that is skipped or unlinked whole has already marked its children by the time the
+    # loop gets to them; a skipped directory passes that on to its own children, and so on down the tree
+    for relative_root_path in sorted(directories, key=lambda path: len(path.parts)):
+        child_relative_source_paths = directories[relative_root_path]
+        if plan[relative_root_path].action is Action.SKIP:
+            mark_children(child_relative_source_paths, Action.SKIP, {Action.NONE}, plan)
             continue
 
-        for child in child_files:
-            child_relative_source_path = relative_root_path / child
-            if child_relative_source_path not in plan:
-                continue
-            destination_path = (
-                destination_root
-                / plan[child_relative_source_path].relative_destination_path
+        destination_path = os.path.join(
+            destination_root_str, plan[relative_root_path].relative_destination_path
+        )
+        is_symlink, exists = _classify_destination(destination_path)
+
+        if exists:
+            children = [
+                plan[child_relative_source_path]
+                for child_relative_source_path in child_relative_source_paths
+                if not plan[child_relative_source_path].is_dir
+            ]
+            symlinked_names = _symlinked_children(
+                destination_path,
+                [child.relative_destination_path.name for child in children],
             )
-            if destination_path.is_symlink():
-                plan[child_relative_source_path].action = Action.UNLINK
+            for child in children:
+                if child.relative_destination_path.name in symlinked_names:
+                    child.action = Action.UNLINK
 
-        destination_path = (
-            destination_root / plan[relative_root_path].relative_destination_path
-        )
         action = None
-        if not destination_path.exists():
+        if not exists:
             action = Action.SKIP
-        elif destination_path.is_symlink():
+        elif is_symlink:
             action = Action.UNLINK
 
         if action is not None:
             plan[relative_root_path].action = action
-            if (
-                source_package_root / plan[relative_root_path].relative_source_path
-            ).is_dir():
-                mark_all_descendents(
-                    relative_root_path,
-                    Action.SKIP,
-                    {Action.NONE},
-                    source_package_root,
-                    plan,
-                )
-
-    del plan[Path(".")]
+            mark_children(child_relative_source_paths, Action.SKIP, {Action.NONE}, plan)
+
+    del plan[ROOT_KEY]
     return plan
+
+
+def _classify_destination(destination_path: str) -> tuple[bool, bool]:
+    """
+    Return `(is_symlink, exists)` for `destination_path` from a single `os.lstat`.
+
+    `exists` follows symlinks, like `os.path.exists`, so a dangling symlink doesn't exist.  Only for a symlink does that
+    take a second call.
+    """
+    try:
+        mode = os.lstat(destination_path).st_mode
+    except (FileNotFoundError, NotADirectoryError):
+        return False, False
+    if stat.S_ISLNK(mode):
+        return True, os.path.exists(destination_path)
+    return False, True
+
+
+def _symlinked_children(destination_path: str, names: list[str]) -> set[str]:
+    """
+    Return which of `names` are symlinks directly inside the directory `destination_path`, listing it once.
+
+    `os.DirEntry.is_symlink` answers from the listing itself (on most platforms), so no child needs a `stat` of its
+    own.  Listing needs read permission, though, where an `os.lstat` of each name only needs search permission; so if
+    the directory can't be listed, each name is checked individually instead.
+    """
+    try:
+        with os.scandir(destination_path) as entries:
+            return {entry.name for entry in entries if entry.is_symlink()}
+    except OSError:
+        return {
+            name
+            for name in names
+            if os.path.islink(os.path.join(destination_path, name))
+        }
@@ -0,0 +1,25 @@
+import os
+
+import pytest
+
+
+def _make_tree(root, spec):
+    """
+    Create the files and directories described by `spec` inside the existing directory `root`.
+
+    `spec` is a dict mapping names to their contents: `None` for an empty file, or another such dict for a directory.
+    Everything is made directly with `os` calls, one `mkdir` or one `open`/`close` per object.
+    """
+    for name, children in spec.items():
+        path = os.path.join(root, name)
+        if children is None:
+            os.close(os.open(path, os.O_CREAT | os.O_WRONLY, 0o644))
+        else:
+            os.mkdir(path)
+            _make_tree(path, children)
+
+
+@pytest.fixture(scope="session")
+def make_tree():
+    """Build a tree of empty files and directories from a nested dict; see `_make_tree`.  Usable at any scope."""
+    return _make_tree
@@ -0,0 +1,29 @@
+"""Builders for the expected `Plan`s that the install and uninstall tests compare against."""
+
+from pathlib import Path
+
+from dotx.plan import PlanNode
+
+
+def expected_node(
+    action,
+    source,
+    destination=None,
+    requires_rename=False,
+    is_dir=False,
+    is_symlink=False,
+):
+    """Build an expected `PlanNode` from strings or Paths; `destination` defaults to `source`."""
+    return PlanNode(
+        action,
+        requires_rename,
+        Path(source),
+        Path(destination or source),
+        is_dir,
+        is_symlink,
+    )
+
+
+def expected_plan(*nodes):
+    """Key expected `PlanNode`s by their source path, as in a `Plan`."""
+    return {node.relative_source_path: node for node in nodes}
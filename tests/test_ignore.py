@@ -1,10 +1,11 @@
+import os
 from pathlib import Path
 
 from dotx.ignore import should_ignore_this_object, prune_ignored_directories
 
 
-# Note: nothing in this file actually tries to use the file-system; so we don't need to
-#   use any special fixtures to help with that
+# Note: nothing in this file actually tries to use the file-system, except to get real
+#   `os.DirEntry`s; so only that test needs the tmp_path fixture
 
 
 def test_should_ignore_end_component():
@@ -39,6 +40,31 @@ def test_should_ignore_middle_component_pattern():
     assert should_ignore
 
 
+def test_should_ignore_full_path_pattern():
+    path = Path("/path/to/deep/directory/file")
+
+    should_ignore = should_ignore_this_object(path, ["*/deep/directory/*"])
+
+    assert should_ignore
+
+
+def test_should_not_ignore_because_pattern_spans_components():
+    path = Path("/path/to/ignorable/but/its/not/at/the/end")
+
+    should_ignore = should_ignore_this_object(path, ["ign*but"])
+
+    assert not should_ignore
+
+
+def test_should_ignore_component_with_separator_in_brackets():
+    path = Path("/path/to/dir/ignorable")
+
+    should_ignore = should_ignore_this_object(path, ["ignorabl[/e]"])
+
+    assert should_ignore
+    assert not prune_ignored_directories(path.parent, ["ignorable"], ["ignorabl[/e]"])
+
+
 def test_should_not_ignore_because_no_excludes():
     path = Path("/path/to/dir/not-ignorable")
 
@@ -133,3 +159,24 @@ def test_prune_one():
     dont_ignore_directories = prune_ignored_directories(root, directories, excludes)
 
     assert len(dont_ignore_directories) == 2
+
+
+def test_prune_directory_entries(tmp_path):
+    for dirname in ["dir1", "dir2", "dir3"]:
+        (tmp_path / dirname).mkdir()
+    with os.scandir(tmp_path) as entries:
+        directories = list(entries)
+    excludes = ["dir2"]
+
+    dont_ignore_directories = prune_ignored_directories(tmp_path, directories, excludes)
+
+    assert sorted(entry.name for entry in dont_ignore_directories) == ["dir1", "dir3"]
+
+
+def test_should_ignore_component_with_brackets_without_fnmatch_wrapper(monkeypatch):
+    monkeypatch.setattr("dotx.ignore._TRANSLATE_PREFIX", "not what translate returns")
+    path = Path("/path/to/dir/ignorable/but/its/not/at/the/end")
+
+    should_ignore = should_ignore_this_object(path, ["ig[!/a-c]orable"])
+
+    assert should_ignore
@@ -1,13 +1,20 @@
+import os
 from pathlib import Path
-from tempfile import TemporaryDirectory
 
-from dotx.install import plan_install, plan_install_paths
-from dotx.plan import Action, PlanNode
+import pytest
 
+from dotx.install import iter_plan_install_paths, plan_install, plan_install_paths
+from dotx.plan import Action
+
+from plan_helpers import expected_node, expected_plan
 
-# TODO: let's use the tmp_path fixture instead of TemporaryDirectory
 # Note: in this file, we never need more than one temporary directory at a time,
-#   so tmp_path is fine.  We don't need tmp_path_factory
+#   so tmp_path is fine.  We don't need tmp_path_factory.  Tests that need both a source
+#   and a destination make them as subdirectories of tmp_path
+
+
+# Every plan from `plan_install_paths` starts with the package root itself
+ROOT_NODE = expected_node(Action.EXISTS, ".", is_dir=True)
 
 
 def test_plan_paths_nothing(tmp_path):
@@ -15,505 +22,505 @@ def test_plan_paths_nothing(tmp_path):
 
     plan = plan_install_paths(source_package_root)
 
-    assert len(plan) == 1
+    assert plan == expected_plan(ROOT_NODE)
+
+
+def test_iter_plan_paths_yields_plan(tmp_path, make_tree):
+    source_package_root = tmp_path
+    make_tree(source_package_root, {"dot-SIMPLE-DIR": {"SIMPLE-FILE": None}})
+
+    pairs = list(iter_plan_install_paths(source_package_root))
+
+    assert [path for path, _ in pairs] == [
+        Path("."),
+        Path("dot-SIMPLE-DIR"),
+        Path("dot-SIMPLE-DIR/SIMPLE-FILE"),
+    ]
+    assert dict(pairs) == plan_install_paths(source_package_root)
+
+
+def test_plan_paths_normal_file(tmp_path, make_tree):
+    source_package_root_path = tmp_path
+    file_path = Path("SIMPLE-FILE")
+    make_tree(source_package_root_path, {"SIMPLE-FILE": None})
+
+    plan = plan_install_paths(source_package_root_path)
+
+    assert plan == expected_plan(ROOT_NODE, expected_node(Action.NONE, file_path))
+
 
+def test_plan_paths_normal_file_fail(tmp_path, make_tree):
+    source_package_root_path = tmp_path
+    file_path = Path("SIMPLE-FILE")
+    make_tree(source_package_root_path, {"SIMPLE-FILE": None})
 
-def test_plan_paths_normal_file():
-    with TemporaryDirectory() as source_package_root:
-        source_package_root_path = Path(source_package_root)
-        file_path = Path("SIMPLE-FILE")
-        (source_package_root_path / file_path).touch()
+    plan = plan_install_paths(source_package_root_path)
 
-        plan = plan_install_paths(source_package_root_path)
+    assert plan == expected_plan(ROOT_NODE, expected_node(Action.NONE, file_path))
 
-        assert len(plan) == 2
-        assert plan[file_path] == PlanNode(
-            Action.NONE, False, file_path, file_path, False
-        )
 
+def test_plan_paths_hidden_file(tmp_path, make_tree):
+    source_package_root_path = tmp_path
+    file_path = Path(".HIDDEN-FILE")
+    make_tree(source_package_root_path, {".HIDDEN-FILE": None})
 
-def test_plan_paths_normal_file_fail():
-    with TemporaryDirectory() as source_package_root:
-        source_package_root_path = Path(source_package_root)
-        file_path = Path("SIMPLE-FILE")
-        (source_package_root_path / file_path).touch()
+    plan = plan_install_paths(source_package_root_path)
 
-        plan = plan_install_paths(source_package_root_path)
+    assert plan == expected_plan(ROOT_NODE, expected_node(Action.NONE, file_path))
 
-        assert len(plan) == 2
-        assert plan[file_path] == PlanNode(
-            Action.NONE, False, file_path, file_path, False
-        )
 
+def test_plan_paths_file_with_renaming(tmp_path, make_tree):
+    source_package_root_path = tmp_path
+    file_path = Path("dot-SIMPLE-FILE")
+    make_tree(source_package_root_path, {"dot-SIMPLE-FILE": None})
 
-def test_plan_paths_hidden_file():
-    with TemporaryDirectory() as source_package_root:
-        source_package_root_path = Path(source_package_root)
-        file_path = Path(".HIDDEN-FILE")
-        (source_package_root_path / file_path).touch()
+    plan = plan_install_paths(source_package_root_path)
 
-        plan = plan_install_paths(source_package_root_path)
+    assert plan == expected_plan(
+        ROOT_NODE, expected_node(Action.NONE, file_path, ".SIMPLE-FILE", True)
+    )
 
-        assert len(plan) == 2
-        assert plan[file_path] == PlanNode(
-            Action.NONE, False, file_path, file_path, False
-        )
 
+def test_plan_paths_dir(tmp_path, make_tree):
+    source_package_root_path = tmp_path
+    dir_path = Path("SIMPLE-DIR")
+    file_path = dir_path / "SIMPLE-FILE"
+    make_tree(source_package_root_path, {"SIMPLE-DIR": {"SIMPLE-FILE": None}})
 
-def test_plan_paths_file_with_renaming():
-    with TemporaryDirectory() as source_package_root:
-        source_package_root_path = Path(source_package_root)
-        file_path = Path("dot-SIMPLE-FILE")
-        (source_package_root_path / file_path).touch()
+    plan = plan_install_paths(source_package_root_path)
 
-        plan = plan_install_paths(source_package_root_path)
+    assert plan == expected_plan(
+        ROOT_NODE,
+        expected_node(Action.NONE, dir_path, is_dir=True),
+        expected_node(Action.NONE, file_path),
+    )
 
-        assert len(plan) == 2
-        assert plan[file_path] == PlanNode(
-            Action.NONE, True, file_path, Path(".SIMPLE-FILE"), False
-        )
 
+def test_plan_paths_dir_inside_dir(tmp_path, make_tree):
+    source_package_root_path = tmp_path
+    dir1_path = Path("SIMPLE-DIR1")
+    dir2_path = dir1_path / "SIMPLE-DIR2"
+    file_path = dir2_path / "SIMPLE-FILE"
+    make_tree(
+        source_package_root_path,
+        {"SIMPLE-DIR1": {"SIMPLE-DIR2": {"SIMPLE-FILE": None}}},
+    )
 
-def test_plan_paths_dir():
-    with TemporaryDirectory() as source_package_root:
-        source_package_root_path = Path(source_package_root)
-        dir_path = Path("SIMPLE-DIR")
-        file_path = dir_path / "SIMPLE-FILE"
-        (source_package_root_path / dir_path).mkdir()
-        (source_package_root_path / file_path).touch()
+    plan = plan_install_paths(source_package_root_path)
 
-        plan = plan_install_paths(source_package_root_path)
+    assert plan == expected_plan(
+        ROOT_NODE,
+        expected_node(Action.NONE, dir1_path, is_dir=True),
+        expected_node(Action.NONE, dir2_path, is_dir=True),
+        expected_node(Action.NONE, file_path),
+    )
 
-        assert len(plan) == 3
-        assert plan[dir_path] == PlanNode(Action.NONE, False, dir_path, dir_path, True)
-        assert plan[file_path].action == Action.NONE
 
+def test_plan_paths_dir_with_hidden_file(tmp_path, make_tree):
+    source_package_root_path = tmp_path
+    dir_path = Path("SIMPLE-DIR")
+    file_path = dir_path / ".HIDDEN-FILE"
+    make_tree(source_package_root_path, {"SIMPLE-DIR": {".HIDDEN-FILE": None}})
 
-def test_plan_paths_dir_inside_dir():
-    with TemporaryDirectory() as source_package_root:
-        source_package_root_path = Path(source_package_root)
-        dir1_path = Path("SIMPLE-DIR1")
-        dir2_path = dir1_path / "SIMPLE-DIR2"
-        file_path = dir2_path / "SIMPLE-FILE"
-        (source_package_root_path / dir2_path).mkdir(parents=True)
-        (source_package_root_path / file_path).touch()
+    plan = plan_install_paths(source_package_root_path)
 
-        plan = plan_install_paths(source_package_root_path)
+    assert plan == expected_plan(
+        ROOT_NODE,
+        expected_node(Action.NONE, dir_path, is_dir=True),
+        expected_node(Action.NONE, file_path),
+    )
 
-        assert len(plan) == 4
-        assert plan[dir1_path] == PlanNode(
-            Action.NONE, False, dir1_path, dir1_path, True
-        )
-        assert plan[dir2_path] == PlanNode(
-            Action.NONE, False, dir2_path, dir2_path, True
-        )
-        assert plan[file_path].action == Action.NONE
-
-
-def test_plan_paths_dir_with_hidden_file():
-    with TemporaryDirectory() as source_package_root:
-        source_package_root_path = Path(source_package_root)
-        dir_path = Path("SIMPLE-DIR")
-        file_path = dir_path / ".HIDDEN-FILE"
-        (source_package_root_path / dir_path).mkdir()
-        (source_package_root_path / file_path).touch()
-
-        plan = plan_install_paths(source_package_root_path)
-
-        assert len(plan) == 3
-        assert plan[dir_path] == PlanNode(Action.NONE, False, dir_path, dir_path, True)
-        assert plan[file_path].action == Action.NONE
-
-
-def test_plan_paths_dir_with_renamed_file():
-    with TemporaryDirectory() as source_package_root:
-        source_package_root_path = Path(source_package_root)
-        dir_path = Path("SIMPLE-DIR")
-        file_path = dir_path / "dot-SIMPLE-FILE"
-        (source_package_root_path / dir_path).mkdir()
-        (source_package_root_path / file_path).touch()
-
-        plan = plan_install_paths(source_package_root_path)
-
-        assert len(plan) == 3
-        assert plan[dir_path] == PlanNode(Action.NONE, False, dir_path, dir_path, True)
-        assert plan[file_path] == PlanNode(
-            Action.NONE, True, file_path, dir_path / ".SIMPLE-FILE", False
-        )
-
-
-def test_plan_paths_hidden_dir():
-    with TemporaryDirectory() as source_package_root:
-        source_package_root_path = Path(source_package_root)
-        dir_path = Path(".HIDDEN-DIR")
-        file_path = dir_path / "SIMPLE-FILE"
-        (source_package_root_path / dir_path).mkdir()
-        (source_package_root_path / file_path).touch()
-
-        plan = plan_install_paths(source_package_root_path)
-
-        assert len(plan) == 3
-        assert plan[dir_path] == PlanNode(Action.NONE, False, dir_path, dir_path, True)
-        assert plan[file_path].action == Action.NONE
-
-
-def test_plan_paths_renamed_dir():
-    with TemporaryDirectory() as source_package_root:
-        source_package_root_path = Path(source_package_root)
-        dir_path = Path("dot-SIMPLE-DIR")
-        file_path = dir_path / "SIMPLE-FILE"
-        (source_package_root_path / dir_path).mkdir()
-        (source_package_root_path / file_path).touch()
-
-        plan = plan_install_paths(source_package_root_path)
-
-        assert len(plan) == 3
-        assert plan[dir_path] == PlanNode(
-            Action.NONE, True, dir_path, Path(".SIMPLE-DIR"), True
-        )
-        assert plan[file_path].action == Action.NONE
-
-
-def test_plan_paths_several_normal_files():
-    with TemporaryDirectory() as source_package_root:
-        source_package_root_path = Path(source_package_root)
-        file1_path = Path("SIMPLE-FILE1")
-        file2_path = Path("SIMPLE-FILE2")
-        file3_path = Path("SIMPLE-FILE3")
-        (source_package_root_path / file1_path).touch()
-        (source_package_root_path / file2_path).touch()
-        (source_package_root_path / file3_path).touch()
-
-        plan = plan_install_paths(source_package_root_path)
-
-        assert len(plan) == 4
-        assert plan[file1_path] == PlanNode(
-            Action.NONE, False, file1_path, file1_path, False
-        )
-        assert plan[file2_path] == PlanNode(
-            Action.NONE, False, file2_path, file2_path, False
-        )
-        assert plan[file3_path] == PlanNode(
-            Action.NONE, False, file3_path, file3_path, False
-        )
-
-
-def test_plan_paths_dir_containing_several_files():
-    with TemporaryDirectory() as source_package_root:
-        source_package_root_path = Path(source_package_root)
-        dir_path = Path("SIMPLE-DIR")
-        file1_path = dir_path / "SIMPLE-FILE1"
-        file2_path = dir_path / "SIMPLE-FILE2"
-        file3_path = dir_path / "SIMPLE-FILE3"
-        (source_package_root_path / dir_path).mkdir()
-        (source_package_root_path / file1_path).touch()
-        (source_package_root_path / file2_path).touch()
-        (source_package_root_path / file3_path).touch()
-
-        plan = plan_install_paths(source_package_root_path)
-
-        assert len(plan) == 5
-        assert plan[dir_path] == PlanNode(Action.NONE, False, dir_path, dir_path, True)
-        assert plan[file1_path].action == Action.NONE
-        assert plan[file2_path].action == Action.NONE
-        assert plan[file3_path].action == Action.NONE
-
-
-def test_plan_paths_dir_containing_several_files_including_rename():
-    with TemporaryDirectory() as source_package_root:
-        source_package_root_path = Path(source_package_root)
-        dir_path = Path("SIMPLE-DIR")
-        file1_path = dir_path / "dot-SIMPLE-FILE1"
-        file2_path = dir_path / "SIMPLE-FILE2"
-        file3_path = dir_path / "SIMPLE-FILE3"
-        (source_package_root_path / dir_path).mkdir()
-        (source_package_root_path / file1_path).touch()
-        (source_package_root_path / file2_path).touch()
-        (source_package_root_path / file3_path).touch()
-
-        plan = plan_install_paths(source_package_root_path)
-
-        assert len(plan) == 5
-        assert plan[dir_path] == PlanNode(Action.NONE, False, dir_path, dir_path, True)
-        assert plan[file1_path].action == Action.NONE
-        assert plan[file1_path].requires_rename
-        assert plan[file2_path].action == Action.NONE
-        assert plan[file3_path].action == Action.NONE
-
-
-def test_plan_paths_renamed_dir_inside_renamed_dir():
-    with TemporaryDirectory() as source_package_root:
-        source_package_root_path = Path(source_package_root)
-        dir1_path = Path("dot-SIMPLE-DIR1")
-        dir2_path = dir1_path / "dot-SIMPLE-DIR2"
-        file_path = dir2_path / "SIMPLE-FILE"
-        (source_package_root_path / dir2_path).mkdir(parents=True)
-        (source_package_root_path / file_path).touch()
-
-        plan = plan_install_paths(source_package_root_path)
-
-        assert len(plan) == 4
-        assert plan[dir1_path] == PlanNode(
-            Action.NONE, True, dir1_path, Path(".SIMPLE-DIR1"), True
-        )
-        assert plan[dir2_path] == PlanNode(
-            Action.NONE, True, dir2_path, Path(".SIMPLE-DIR1/.SIMPLE-DIR2"), True
-        )
-        assert plan[file_path].action == Action.NONE
-
-
-def test_install_nothing():
-    with TemporaryDirectory() as source_package_root, TemporaryDirectory() as destination_root:
-        plan = plan_install(Path(source_package_root), Path(destination_root))
-
-        assert len(plan) == 0
-
-
-def test_install_normal_file():
-    with TemporaryDirectory() as source_package_root, TemporaryDirectory() as destination_root:
-        source_package_root_path = Path(source_package_root)
-        file_path = Path("SIMPLE-FILE")
-        (source_package_root_path / file_path).touch()
-
-        plan = plan_install(source_package_root_path, Path(destination_root))
-
-        assert len(plan) == 1
-        assert plan[file_path] == PlanNode(
-            Action.LINK, False, file_path, file_path, False
-        )
-
-
-def test_install_normal_file_fail():
-    with TemporaryDirectory() as source_package_root, TemporaryDirectory() as destination_root:
-        source_package_root_path = Path(source_package_root)
-        destination_root_path = Path(destination_root)
-        file_path = Path("SIMPLE-FILE")
-        (source_package_root_path / file_path).touch()
-        (destination_root_path / file_path).touch()
-
-        plan = plan_install(source_package_root_path, Path(destination_root))
-
-        assert len(plan) == 1
-        assert plan[file_path] == PlanNode(
-            Action.FAIL, False, file_path, file_path, False
-        )
-
-
-def test_install_hidden_file():
-    with TemporaryDirectory() as source_package_root, TemporaryDirectory() as destination_root:
-        source_package_root_path = Path(source_package_root)
-        file_path = Path(".HIDDEN-FILE")
-        (source_package_root_path / file_path).touch()
-
-        plan = plan_install(source_package_root_path, Path(destination_root))
-
-        assert len(plan) == 1
-        assert plan[file_path] == PlanNode(
-            Action.LINK, False, file_path, file_path, False
-        )
 
+def test_plan_paths_dir_with_renamed_file(tmp_path, make_tree):
+    source_package_root_path = tmp_path
+    dir_path = Path("SIMPLE-DIR")
+    file_path = dir_path / "dot-SIMPLE-FILE"
+    make_tree(source_package_root_path, {"SIMPLE-DIR": {"dot-SIMPLE-FILE": None}})
 
-def test_install_file_with_renaming():
-    with TemporaryDirectory() as source_package_root, TemporaryDirectory() as destination_root:
-        source_package_root_path = Path(source_package_root)
-        file_path = Path("dot-SIMPLE-FILE")
-        (source_package_root_path / file_path).touch()
-
-        plan = plan_install(source_package_root_path, Path(destination_root))
-
-        assert len(plan) == 1
-        assert plan[file_path] == PlanNode(
-            Action.LINK, True, file_path, Path(".SIMPLE-FILE"), False
-        )
-
-
-def test_install_dir():
-    with TemporaryDirectory() as source_package_root, TemporaryDirectory() as destination_root:
-        source_package_root_path = Path(source_package_root)
-        dir_path = Path("SIMPLE-DIR")
-        file_path = dir_path / "SIMPLE-FILE"
-        (source_package_root_path / dir_path).mkdir()
-        (source_package_root_path / file_path).touch()
-
-        plan = plan_install(source_package_root_path, Path(destination_root))
-
-        assert len(plan) == 2
-        assert plan[dir_path] == PlanNode(Action.LINK, False, dir_path, dir_path, True)
-        assert plan[file_path].action == Action.SKIP
-
-
-def test_install_dir_inside_dir():
-    with TemporaryDirectory() as source_package_root, TemporaryDirectory() as destination_root:
-        source_package_root_path = Path(source_package_root)
-        dir1_path = Path("SIMPLE-DIR1")
-        dir2_path = dir1_path / "SIMPLE-DIR2"
-        file_path = dir2_path / "SIMPLE-FILE"
-        (source_package_root_path / dir2_path).mkdir(parents=True)
-        (source_package_root_path / file_path).touch()
-
-        plan = plan_install(source_package_root_path, Path(destination_root))
-
-        assert len(plan) == 3
-        assert plan[dir1_path] == PlanNode(
-            Action.LINK, False, dir1_path, dir1_path, True
-        )
-        assert plan[dir2_path] == PlanNode(
-            Action.SKIP, False, dir2_path, dir2_path, True
-        )
-        assert plan[file_path].action == Action.SKIP
-
-
-def test_install_dir_with_hidden_file():
-    with TemporaryDirectory() as source_package_root, TemporaryDirectory() as destination_root:
-        source_package_root_path = Path(source_package_root)
-        dir_path = Path("SIMPLE-DIR")
-        file_path = dir_path / ".HIDDEN-FILE"
-        (source_package_root_path / dir_path).mkdir()
-        (source_package_root_path / file_path).touch()
-
-        plan = plan_install(source_package_root_path, Path(destination_root))
-
-        assert len(plan) == 2
-        assert plan[dir_path] == PlanNode(Action.LINK, False, dir_path, dir_path, True)
-        assert plan[file_path].action == Action.SKIP
-
-
-def test_install_dir_with_renamed_file():
-    with TemporaryDirectory() as source_package_root, TemporaryDirectory() as destination_root:
-        source_package_root_path = Path(source_package_root)
-        dir_path = Path("SIMPLE-DIR")
-        file_path = dir_path / "dot-SIMPLE-FILE"
-        (source_package_root_path / dir_path).mkdir()
-        (source_package_root_path / file_path).touch()
-
-        plan = plan_install(source_package_root_path, Path(destination_root))
-
-        assert len(plan) == 2
-        assert plan[dir_path] == PlanNode(
-            Action.CREATE, False, dir_path, dir_path, True
-        )
-        assert plan[file_path] == PlanNode(
-            Action.LINK, True, file_path, dir_path / ".SIMPLE-FILE", False
-        )
-
-
-def test_install_hidden_dir():
-    with TemporaryDirectory() as source_package_root, TemporaryDirectory() as destination_root:
-        source_package_root_path = Path(source_package_root)
-        dir_path = Path(".HIDDEN-DIR")
-        file_path = dir_path / "SIMPLE-FILE"
-        (source_package_root_path / dir_path).mkdir()
-        (source_package_root_path / file_path).touch()
-
-        plan = plan_install(source_package_root_path, Path(destination_root))
-
-        assert len(plan) == 2
-        assert plan[dir_path] == PlanNode(Action.LINK, False, dir_path, dir_path, True)
-        assert plan[file_path].action == Action.SKIP
-
-
-def test_install_renamed_dir():
-    with TemporaryDirectory() as source_package_root, TemporaryDirectory() as destination_root:
-        source_package_root_path = Path(source_package_root)
-        dir_path = Path("dot-SIMPLE-DIR")
-        file_path = dir_path / "SIMPLE-FILE"
-        (source_package_root_path / dir_path).mkdir()
-        (source_package_root_path / file_path).touch()
-
-        plan = plan_install(source_package_root_path, Path(destination_root))
-
-        assert len(plan) == 2
-        assert plan[dir_path] == PlanNode(
-            Action.LINK, True, dir_path, Path(".SIMPLE-DIR"), True
-        )
-        assert plan[file_path].action == Action.SKIP
-
-
-def test_install_several_normal_files():
-    with TemporaryDirectory() as source_package_root, TemporaryDirectory() as destination_root:
-        source_package_root_path = Path(source_package_root)
-        file1_path = Path("SIMPLE-FILE1")
-        file2_path = Path("SIMPLE-FILE2")
-        file3_path = Path("SIMPLE-FILE3")
-        (source_package_root_path / file1_path).touch()
-        (source_package_root_path / file2_path).touch()
-        (source_package_root_path / file3_path).touch()
-
-        plan = plan_install(source_package_root_path, Path(destination_root))
-
-        assert len(plan) == 3
-        assert plan[file1_path] == PlanNode(
-            Action.LINK, False, file1_path, file1_path, False
-        )
-        assert plan[file2_path] == PlanNode(
-            Action.LINK, False, file2_path, file2_path, False
-        )
-        assert plan[file3_path] == PlanNode(
-            Action.LINK, False, file3_path, file3_path, False
-        )
-
-
-def test_install_dir_containing_several_files():
-    with TemporaryDirectory() as source_package_root, TemporaryDirectory() as destination_root:
-        source_package_root_path = Path(source_package_root)
-        dir_path = Path("SIMPLE-DIR")
-        file1_path = dir_path / "SIMPLE-FILE1"
-        file2_path = dir_path / "SIMPLE-FILE2"
-        file3_path = dir_path / "SIMPLE-FILE3"
-        (source_package_root_path / dir_path).mkdir()
-        (source_package_root_path / file1_path).touch()
-        (source_package_root_path / file2_path).touch()
-        (source_package_root_path / file3_path).touch()
-
-        plan = plan_install(source_package_root_path, Path(destination_root))
-
-        assert len(plan) == 4
-        assert plan[dir_path] == PlanNode(Action.LINK, False, dir_path, dir_path, True)
-        assert plan[file1_path].action == Action.SKIP
-        assert plan[file2_path].action == Action.SKIP
-        assert plan[file3_path].action == Action.SKIP
-
-
-def test_install_dir_containing_several_files_including_rename():
-    with TemporaryDirectory() as source_package_root, TemporaryDirectory() as destination_root:
-        source_package_root_path = Path(source_package_root)
-        dir_path = Path("SIMPLE-DIR")
-        file1_path = dir_path / "dot-SIMPLE-FILE1"
-        file2_path = dir_path / "SIMPLE-FILE2"
-        file3_path = dir_path / "SIMPLE-FILE3"
-        (source_package_root_path / dir_path).mkdir()
-        (source_package_root_path / file1_path).touch()
-        (source_package_root_path / file2_path).touch()
-        (source_package_root_path / file3_path).touch()
-
-        plan = plan_install(source_package_root_path, Path(destination_root))
-
-        assert len(plan) == 4
-        assert plan[dir_path] == PlanNode(
-            Action.CREATE, False, dir_path, dir_path, True
-        )
-        assert plan[file1_path].action == Action.LINK
-        assert plan[file1_path].requires_rename
-        assert plan[file2_path].action == Action.LINK
-        assert plan[file3_path].action == Action.LINK
-
-
-def test_install_renamed_dir_inside_renamed_dir():
-    with TemporaryDirectory() as source_package_root, TemporaryDirectory() as destination_root:
-        source_package_root_path = Path(source_package_root)
-        dir1_path = Path("dot-SIMPLE-DIR1")
-        dir2_path = dir1_path / "dot-SIMPLE-DIR2"
-        file_path = dir2_path / "SIMPLE-FILE"
-        (source_package_root_path / dir2_path).mkdir(parents=True)
-        (source_package_root_path / file_path).touch()
-
-        plan = plan_install(source_package_root_path, Path(destination_root))
-
-        assert len(plan) == 3
-        assert plan[dir1_path] == PlanNode(
-            Action.CREATE, True, dir1_path, Path(".SIMPLE-DIR1"), True
-        )
-        assert plan[dir2_path] == PlanNode(
-            Action.LINK, True, dir2_path, Path(".SIMPLE-DIR1/.SIMPLE-DIR2"), True
-        )
-        assert plan[file_path].action == Action.SKIP
+    plan = plan_install_paths(source_package_root_path)
+
+    assert plan == expected_plan(
+        ROOT_NODE,
+        expected_node(Action.NONE, dir_path, is_dir=True),
+        expected_node(Action.NONE, file_path, dir_path / ".SIMPLE-FILE", True),
+    )
+
+
+def test_plan_paths_hidden_dir(tmp_path, make_tree):
+    source_package_root_path = tmp_path
+    dir_path = Path(".HIDDEN-DIR")
+    file_path = dir_path / "SIMPLE-FILE"
+    make_tree(source_package_root_path, {".HIDDEN-DIR": {"SIMPLE-FILE": None}})
+
+    plan = plan_install_paths(source_package_root_path)
+
+    assert plan == expected_plan(
+        ROOT_NODE,
+        expected_node(Action.NONE, dir_path, is_dir=True),
+        expected_node(Action.NONE, file_path),
+    )
+
+
+def test_plan_paths_renamed_dir(tmp_path, make_tree):
+    source_package_root_path = tmp_path
+    dir_path = Path("dot-SIMPLE-DIR")
+    file_path = dir_path / "SIMPLE-FILE"
+    make_tree(source_package_root_path, {"dot-SIMPLE-DIR": {"SIMPLE-FILE": None}})
+
+    plan = plan_install_paths(source_package_root_path)
+
+    assert plan == expected_plan(
+        ROOT_NODE,
+        expected_node(Action.NONE, dir_path, ".SIMPLE-DIR", True, True),
+        expected_node(Action.NONE, file_path, ".SIMPLE-DIR/SIMPLE-FILE"),
+    )
+
+
+def test_plan_paths_several_normal_files(tmp_path, make_tree):
+    source_package_root_path = tmp_path
+    file1_path = Path("SIMPLE-FILE1")
+    file2_path = Path("SIMPLE-FILE2")
+    file3_path = Path("SIMPLE-FILE3")
+    make_tree(
+        source_package_root_path,
+        {"SIMPLE-FILE1": None, "SIMPLE-FILE2": None, "SIMPLE-FILE3": None},
+    )
+
+    plan = plan_install_paths(source_package_root_path)
+
+    assert plan == expected_plan(
+        ROOT_NODE,
+        expected_node(Action.NONE, file1_path),
+        expected_node(Action.NONE, file2_path),
+        expected_node(Action.NONE, file3_path),
+    )
+
+
+def test_plan_paths_dir_containing_several_files(tmp_path, make_tree):
+    source_package_root_path = tmp_path
+    dir_path = Path("SIMPLE-DIR")
+    file1_path = dir_path / "SIMPLE-FILE1"
+    file2_path = dir_path / "SIMPLE-FILE2"
+    file3_path = dir_path / "SIMPLE-FILE3"
+    make_tree(
+        source_package_root_path,
+        {
+            "SIMPLE-DIR": {
+                "SIMPLE-FILE1": None,
+                "SIMPLE-FILE2": None,
+                "SIMPLE-FILE3": None,
+            }
+        },
+    )
+
+    plan = plan_install_paths(source_package_root_path)
+
+    assert plan == expected_plan(
+        ROOT_NODE,
+        expected_node(Action.NONE, dir_path, is_dir=True),
+        expected_node(Action.NONE, file1_path),
+        expected_node(Action.NONE, file2_path),
+        expected_node(Action.NONE, file3_path),
+    )
+
+
+def test_plan_paths_dir_containing_several_files_including_rename(tmp_path, make_tree):
+    source_package_root_path = tmp_path
+    dir_path = Path("SIMPLE-DIR")
+    file1_path = dir_path / "dot-SIMPLE-FILE1"
+    file2_path = dir_path / "SIMPLE-FILE2"
+    file3_path = dir_path / "SIMPLE-FILE3"
+    make_tree(
+        source_package_root_path,
+        {
+            "SIMPLE-DIR": {
+                "dot-SIMPLE-FILE1": None,
+                "SIMPLE-FILE2": None,
+                "SIMPLE-FILE3": None,
+            }
+        },
+    )
+
+    plan = plan_install_paths(source_package_root_path)
+
+    assert plan == expected_plan(
+        ROOT_NODE,
+        expected_node(Action.NONE, dir_path, is_dir=True),
+        expected_node(Action.NONE, file1_path, dir_path / ".SIMPLE-FILE1", True),
+        expected_node(Action.NONE, file2_path),
+        expected_node(Action.NONE, file3_path),
+    )
+
+
+def test_plan_paths_renamed_dir_inside_renamed_dir(tmp_path, make_tree):
+    source_package_root_path = tmp_path
+    dir1_path = Path("dot-SIMPLE-DIR1")
+    dir2_path = dir1_path / "dot-SIMPLE-DIR2"
+    file_path = dir2_path / "SIMPLE-FILE"
+    make_tree(
+        source_package_root_path,
+        {"dot-SIMPLE-DIR1": {"dot-SIMPLE-DIR2": {"SIMPLE-FILE": None}}},
+    )
+
+    plan = plan_install_paths(source_package_root_path)
+
+    assert plan == expected_plan(
+        ROOT_NODE,
+        expected_node(Action.NONE, dir1_path, ".SIMPLE-DIR1", True, True),
+        expected_node(Action.NONE, dir2_path, ".SIMPLE-DIR1/.SIMPLE-DIR2", True, True),
+        expected_node(Action.NONE, file_path, ".SIMPLE-DIR1/.SIMPLE-DIR2/SIMPLE-FILE"),
+    )
+
+
+def test_plan_paths_symlinked_dir_not_descended(tmp_path, make_tree):
+    source_package_root_path = tmp_path
+    dir_path = Path("SIMPLE-DIR")
+    link_path = Path("LINKED-DIR")
+    make_tree(source_package_root_path, {"SIMPLE-DIR": {"SIMPLE-FILE": None}})
+    (source_package_root_path / link_path).symlink_to(dir_path)
+
+    plan = plan_install_paths(source_package_root_path)
+
+    assert plan == expected_plan(
+        ROOT_NODE,
+        expected_node(Action.NONE, dir_path, is_dir=True),
+        expected_node(Action.NONE, dir_path / "SIMPLE-FILE"),
+        expected_node(Action.NONE, link_path, is_dir=True, is_symlink=True),
+    )
+
+
+INSTALL_SCENARIOS = [
+    pytest.param({}, {}, expected_plan(), id="nothing"),
+    pytest.param(
+        {"SIMPLE-FILE": None},
+        {},
+        expected_plan(expected_node(Action.LINK, "SIMPLE-FILE")),
+        id="normal_file",
+    ),
+    pytest.param(
+        {"SIMPLE-FILE": None},
+        {"SIMPLE-FILE": None},
+        expected_plan(expected_node(Action.FAIL, "SIMPLE-FILE")),
+        id="normal_file_fail",
+    ),
+    pytest.param(
+        {".HIDDEN-FILE": None},
+        {},
+        expected_plan(expected_node(Action.LINK, ".HIDDEN-FILE")),
+        id="hidden_file",
+    ),
+    pytest.param(
+        {"dot-SIMPLE-FILE": None},
+        {},
+        expected_plan(
+            expected_node(Action.LINK, "dot-SIMPLE-FILE", ".SIMPLE-FILE", True)
+        ),
+        id="file_with_renaming",
+    ),
+    pytest.param(
+        {"SIMPLE-DIR": {"SIMPLE-FILE": None}},
+        {},
+        expected_plan(
+            expected_node(Action.LINK, "SIMPLE-DIR", is_dir=True),
+            expected_node(Action.SKIP, "SIMPLE-DIR/SIMPLE-FILE"),
+        ),
+        id="dir",
+    ),
+    pytest.param(
+        {"SIMPLE-DIR1": {"SIMPLE-DIR2": {"SIMPLE-FILE": None}}},
+        {},
+        expected_plan(
+            expected_node(Action.LINK, "SIMPLE-DIR1", is_dir=True),
+            expected_node(Action.SKIP, "SIMPLE-DIR1/SIMPLE-DIR2", is_dir=True),
+            expected_node(Action.SKIP, "SIMPLE-DIR1/SIMPLE-DIR2/SIMPLE-FILE"),
+        ),
+        id="dir_inside_dir",
+    ),
+    pytest.param(
+        {"SIMPLE-DIR": {".HIDDEN-FILE": None}},
+        {},
+        expected_plan(
+            expected_node(Action.LINK, "SIMPLE-DIR", is_dir=True),
+            expected_node(Action.SKIP, "SIMPLE-DIR/.HIDDEN-FILE"),
+        ),
+        id="dir_with_hidden_file",
+    ),
+    pytest.param(
+        {"SIMPLE-DIR": {"dot-SIMPLE-FILE": None}},
+        {},
+        expected_plan(
+            expected_node(Action.CREATE, "SIMPLE-DIR", is_dir=True),
+            expected_node(
+                Action.LINK,
+                "SIMPLE-DIR/dot-SIMPLE-FILE",
+                "SIMPLE-DIR/.SIMPLE-FILE",
+                True,
+            ),
+        ),
+        id="dir_with_renamed_file",
+    ),
+    pytest.param(
+        {".HIDDEN-DIR": {"SIMPLE-FILE": None}},
+        {},
+        expected_plan(
+            expected_node(Action.LINK, ".HIDDEN-DIR", is_dir=True),
+            expected_node(Action.SKIP, ".HIDDEN-DIR/SIMPLE-FILE"),
+        ),
+        id="hidden_dir",
+    ),
+    pytest.param(
+        {"dot-SIMPLE-DIR": {"SIMPLE-FILE": None}},
+        {},
+        expected_plan(
+            expected_node(Action.LINK, "dot-SIMPLE-DIR", ".SIMPLE-DIR", True, True),
+            expected_node(
+                Action.SKIP, "dot-SIMPLE-DIR/SIMPLE-FILE", ".SIMPLE-DIR/SIMPLE-FILE"
+            ),
+        ),
+        id="renamed_dir",
+    ),
+    pytest.param(
+        {"SIMPLE-FILE1": None, "SIMPLE-FILE2": None, "SIMPLE-FILE3": None},
+        {},
+        expected_plan(
+            expected_node(Action.LINK, "SIMPLE-FILE1"),
+            expected_node(Action.LINK, "SIMPLE-FILE2"),
+            expected_node(Action.LINK, "SIMPLE-FILE3"),
+        ),
+        id="several_normal_files",
+    ),
+    pytest.param(
+        {
+            "SIMPLE-DIR": {
+                "SIMPLE-FILE1": None,
+                "SIMPLE-FILE2": None,
+                "SIMPLE-FILE3": None,
+            }
+        },
+        {},
+        expected_plan(
+            expected_node(Action.LINK, "SIMPLE-DIR", is_dir=True),
+            expected_node(Action.SKIP, "SIMPLE-DIR/SIMPLE-FILE1"),
+            expected_node(Action.SKIP, "SIMPLE-DIR/SIMPLE-FILE2"),
+            expected_node(Action.SKIP, "SIMPLE-DIR/SIMPLE-FILE3"),
+        ),
+        id="dir_containing_several_files",
+    ),
+    pytest.param(
+        {
+            "SIMPLE-DIR": {
+                "dot-SIMPLE-FILE1": None,
+                "SIMPLE-FILE2": None,
+                "SIMPLE-FILE3": None,
+            }
+        },
+        {},
+        expected_plan(
+            expected_node(Action.CREATE, "SIMPLE-DIR", is_dir=True),
+            expected_node(
+                Action.LINK,
+                "SIMPLE-DIR/dot-SIMPLE-FILE1",
+                "SIMPLE-DIR/.SIMPLE-FILE1",
+                True,
+            ),
+            expected_node(Action.LINK, "SIMPLE-DIR/SIMPLE-FILE2"),
+            expected_node(Action.LINK, "SIMPLE-DIR/SIMPLE-FILE3"),
+        ),
+        id="dir_containing_several_files_including_rename",
+    ),
+    pytest.param(
+        {"dot-SIMPLE-DIR1": {"dot-SIMPLE-DIR2": {"SIMPLE-FILE": None}}},
+        {},
+        expected_plan(
+            expected_node(Action.CREATE, "dot-SIMPLE-DIR1", ".SIMPLE-DIR1", True, True),
+            expected_node(
+                Action.LINK,
+                "dot-SIMPLE-DIR1/dot-SIMPLE-DIR2",
+                ".SIMPLE-DIR1/.SIMPLE-DIR2",
+                True,
+                True,
+            ),
+            expected_node(
+                Action.SKIP,
+                "dot-SIMPLE-DIR1/dot-SIMPLE-DIR2/SIMPLE-FILE",
+                ".SIMPLE-DIR1/.SIMPLE-DIR2/SIMPLE-FILE",
+            ),
+        ),
+        id="renamed_dir_inside_renamed_dir",
+    ),
+]
+
+
+@pytest.mark.parametrize("source_tree, destination_tree, expected", INSTALL_SCENARIOS)
+def test_install(tmp_path, make_tree, source_tree, destination_tree, expected):
+    source_package_root_path = tmp_path / "source"
+    destination_root_path = tmp_path / "destination"
+    source_package_root_path.mkdir()
+    destination_root_path.mkdir()
+    make_tree(source_package_root_path, source_tree)
+    make_tree(destination_root_path, destination_tree)
+
+    plan = plan_install(source_package_root_path, destination_root_path)
+
+    assert plan == expected
+
+
+def test_install_dangling_symlink_fail(tmp_path, make_tree):
+    source_package_root = tmp_path / "source"
+    destination_root = tmp_path / "destination"
+    source_package_root.mkdir()
+    destination_root.mkdir()
+    file_path = Path("SIMPLE-FILE")
+    make_tree(source_package_root, {"SIMPLE-FILE": None})
+    (destination_root / file_path).symlink_to(tmp_path / "NOWHERE")
+
+    plan = plan_install(source_package_root, destination_root)
+
+    assert plan == expected_plan(expected_node(Action.FAIL, file_path))
+
+
+def test_install_symlink_loop_fail(tmp_path, make_tree):
+    source_package_root = tmp_path / "source"
+    destination_root = tmp_path / "destination"
+    make_tree(
+        tmp_path, {"source": {"SIMPLE-DIR": {"SIMPLE-FILE": None}}, "destination": {}}
+    )
+    (destination_root / "SIMPLE-DIR").symlink_to("SIMPLE-DIR")
+
+    plan = plan_install(source_package_root, destination_root)
+
+    assert plan == expected_plan(
+        expected_node(Action.FAIL, "SIMPLE-DIR", is_dir=True),
+        expected_node(Action.LINK, "SIMPLE-DIR/SIMPLE-FILE"),
+    )
+
+
+def test_install_unreadable_destination_fail(tmp_path, make_tree, monkeypatch):
+    source_package_root = tmp_path / "source"
+    destination_root = tmp_path / "destination"
+    make_tree(
+        tmp_path,
+        {
+            "source": {"SIMPLE-DIR": {"dot-SIMPLE-FILE": None}, "SIMPLE-FILE": None},
+            "destination": {"SIMPLE-DIR": {".SIMPLE-FILE": None}, "SIMPLE-FILE": None},
+        },
+    )
+    # As if every destination directory could be searched, but not read
+    scandir = os.scandir
+
+    def unreadable_destination_scandir(path):
+        if os.fspath(path).startswith(os.fspath(destination_root)):
+            raise PermissionError(path)
+        return scandir(path)
+
+    monkeypatch.setattr("dotx.install.os.scandir", unreadable_destination_scandir)
+
+    plan = plan_install(source_package_root, destination_root)
+
+    assert plan == expected_plan(
+        expected_node(Action.CREATE, "SIMPLE-DIR", is_dir=True),
+        expected_node(
+            Action.FAIL, "SIMPLE-DIR/dot-SIMPLE-FILE", "SIMPLE-DIR/.SIMPLE-FILE", True
+        ),
+        expected_node(Action.FAIL, "SIMPLE-FILE"),
+    )
@@ -0,0 +1,119 @@
+import pytest
+
+from dotx.plan import Action
+from dotx.uninstall import plan_uninstall
+
+from plan_helpers import expected_node, expected_plan
+
+# Note: plan_uninstall never changes the source package, so every test but the first shares one source tree, built
+#   once per session with tmp_path_factory.  Each test makes only its own destination, in tmp_path
+
+
+SOURCE_TREE = {
+    "LINKED-FILE": None,
+    "dot-LINKED-FILE": None,
+    "REAL-FILE": None,
+    "LINKED-DIR": {"SIMPLE-FILE": None},
+    "MISSING-DIR": {"SIMPLE-FILE": None, "SUBDIR": {"SIMPLE-FILE": None}},
+    "REAL-DIR": {"LINKED-FILE": None},
+}
+
+
+@pytest.fixture(scope="session")
+def source_package_root(tmp_path_factory, make_tree):
+    """The `SOURCE_TREE`, built once and shared, read-only, by every test that asks for it."""
+    root = tmp_path_factory.mktemp("source")
+    make_tree(root, SOURCE_TREE)
+    return root
+
+
+def test_uninstall_nothing(tmp_path):
+    source_package_root = tmp_path / "source"
+    destination_root = tmp_path / "destination"
+    source_package_root.mkdir()
+    destination_root.mkdir()
+
+    plan = plan_uninstall(source_package_root, destination_root)
+
+    assert plan == {}
+
+
+def test_uninstall_files(source_package_root, tmp_path, make_tree):
+    destination_root = tmp_path
+    make_tree(destination_root, {"REAL-FILE": None})
+    (destination_root / "LINKED-FILE").symlink_to(source_package_root / "LINKED-FILE")
+    (destination_root / ".LINKED-FILE").symlink_to(
+        source_package_root / "dot-LINKED-FILE"
+    )
+
+    plan = plan_uninstall(source_package_root, destination_root)
+
+    assert plan == expected_plan(
+        expected_node(Action.UNLINK, "LINKED-FILE"),
+        expected_node(
+            Action.UNLINK, "dot-LINKED-FILE", ".LINKED-FILE", requires_rename=True
+        ),
+        expected_node(Action.NONE, "REAL-FILE"),
+        expected_node(Action.SKIP, "LINKED-DIR", is_dir=True),
+        expected_node(Action.SKIP, "LINKED-DIR/SIMPLE-FILE"),
+        expected_node(Action.SKIP, "MISSING-DIR", is_dir=True),
+        expected_node(Action.SKIP, "MISSING-DIR/SIMPLE-FILE"),
+        expected_node(Action.SKIP, "MISSING-DIR/SUBDIR", is_dir=True),
+        expected_node(Action.SKIP, "MISSING-DIR/SUBDIR/SIMPLE-FILE"),
+        expected_node(Action.SKIP, "REAL-DIR", is_dir=True),
+        expected_node(Action.SKIP, "REAL-DIR/LINKED-FILE"),
+    )
+
+
+def test_uninstall_directories(source_package_root, tmp_path, make_tree):
+    destination_root = tmp_path
+    make_tree(destination_root, {"REAL-DIR": {}})
+    (destination_root / "LINKED-DIR").symlink_to(
+        source_package_root / "LINKED-DIR", target_is_directory=True
+    )
+    (destination_root / "REAL-DIR" / "LINKED-FILE").symlink_to(
+        source_package_root / "REAL-DIR" / "LINKED-FILE"
+    )
+
+    plan = plan_uninstall(source_package_root, destination_root)
+
+    assert plan == expected_plan(
+        expected_node(Action.NONE, "LINKED-FILE"),
+        expected_node(
+            Action.NONE, "dot-LINKED-FILE", ".LINKED-FILE", requires_rename=True
+        ),
+        expected_node(Action.NONE, "REAL-FILE"),
+        expected_node(Action.UNLINK, "LINKED-DIR", is_dir=True),
+        expected_node(Action.SKIP, "LINKED-DIR/SIMPLE-FILE"),
+        expected_node(Action.SKIP, "MISSING-DIR", is_dir=True),
+        expected_node(Action.SKIP, "MISSING-DIR/SIMPLE-FILE"),
+        expected_node(Action.SKIP, "MISSING-DIR/SUBDIR", is_dir=True),
+        expected_node(Action.SKIP, "MISSING-DIR/SUBDIR/SIMPLE-FILE"),
+        expected_node(Action.NONE, "REAL-DIR", is_dir=True),
+        expected_node(Action.UNLINK, "REAL-DIR/LINKED-FILE"),
+    )
+
+
+def test_uninstall_dangling_symlink_directory_skip(source_package_root, tmp_path):
+    destination_root = tmp_path
+    (destination_root / "MISSING-DIR").symlink_to(
+        tmp_path / "NOWHERE", target_is_directory=True
+    )
+
+    plan = plan_uninstall(source_package_root, destination_root)
+
+    assert plan == expected_plan(
+        expected_node(Action.NONE, "LINKED-FILE"),
+        expected_node(
+            Action.NONE, "dot-LINKED-FILE", ".LINKED-FILE", requires_rename=True
+        ),
+        expected_node(Action.NONE, "REAL-FILE"),
+        expected_node(Action.SKIP, "LINKED-DIR", is_dir=True),
+        expected_node(Action.SKIP, "LINKED-DIR/SIMPLE-FILE"),
+        expected_node(Action.SKIP, "MISSING-DIR", is_dir=True),
+        expected_node(Action.SKIP, "MISSING-DIR/SIMPLE-FILE"),
+        expected_node(Action.SKIP, "MISSING-DIR/SUBDIR", is_dir=True),
+        expected_node(Action.SKIP, "MISSING-DIR/SUBDIR/SIMPLE-FILE"),
+        expected_node(Action.SKIP, "REAL-DIR", is_dir=True),
+        expected_node(Action.SKIP, "REAL-DIR/LINKED-FILE"),
+    )